@@ -13,7 +13,7 @@
 # 1. Single VM enforcement - prevents creating multiple instances to stay within Free Tier
 # 2. Pre-configured defaults - e2-micro, us-west1-a zone, 30GB standard disk
 # 3. Interactive setup - configure GCP project and Ubuntu image via 'set' command
-# 4. Smart validation - checks VM existence before create/delete operations
+# 4. Smart validation - reports existing/missing VMs from the create/delete call itself
 # 5. Progress indicators - animated spinners for long-running operations
 # 6. Ubuntu LTS focus - filtered list of AMD64 LTS images (22.04, 24.04)
 #
@@ -21,6 +21,8 @@
 # - Google Cloud SDK (gcloud) installed and authenticated
 # - GCP project with Compute Engine API enabled
 # - ~/.env file with GCP_PROJECT set (use 'set' command to configure)
+# - Optional: google-auth and requests with Application Default Credentials, to call
+#   the Compute Engine API directly instead of spawning gcloud (faster)
 #
 # Usage:
 #   python3 gcp-free.py list     - List VM instances
@@ -36,46 +38,130 @@ import os
 import time
 import threading
 import atexit
+import collections
+import functools
+import json
+import re
+import shutil
+import tempfile
 from pathlib import Path
 
+# Optional fast path: talk to the Compute Engine REST API directly instead of
+# spawning gcloud for every call. Requires google-auth and requests.
+try:
+    import google.auth
+    import google.auth.exceptions
+    from google.auth import _cloud_sdk
+    from google.auth.transport.requests import AuthorizedSession, Request
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    google = None
+
+ENV_PATH = Path.home() / '.env'
+
 # Load environment variables from ~/.env
 def load_env():
-    env_path = Path.home() / '.env'
-    if env_path.exists():
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
-
-load_env()
-
-DEFAULT_PROJECT = os.getenv('GCP_PROJECT', 'your-default-project')
+    if ENV_PATH.exists():
+        lines = (line.strip() for line in ENV_PATH.read_text().splitlines())
+        os.environ.update(
+            (key.strip(), value.strip())
+            for key, value in (line.split('=', 1) for line in lines
+                               if line and not line.startswith('#') and '=' in line)
+        )
+
+def _write_env_file(content):
+    """Atomically replace ~/.env, keeping its permissions and any symlink to it."""
+    # Write next to the real file (a dotfiles symlink keeps pointing at it) and swap
+    # it in, so an interrupt never leaves a torn or truncated ~/.env
+    target = ENV_PATH.resolve()
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=target.name + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            if target.exists():
+                shutil.copymode(target, tmp_name)
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+Defaults = collections.namedtuple('Defaults', ['project', 'image'])
+
+@functools.lru_cache(maxsize=1)
+def get_defaults():
+    """Load ~/.env on first use and return the configured project and image."""
+    load_env()
+    return Defaults(
+        project=os.getenv('GCP_PROJECT', 'your-default-project'),
+        image=os.getenv('GCP_IMAGE', 'ubuntu-2204-jammy-v20250815'),
+    )
+
 DEFAULT_ZONE = "us-west1-a"
-DEFAULT_IMAGE = os.getenv('GCP_IMAGE', 'ubuntu-2204-jammy-v20250815')
 
-def check_dependencies():
+# Ubuntu LTS AMD64 Standard images (22.04, 24.04), filtered entirely by gcloud
+# (the include/exclude patterns are compiled once and shared with the REST API path)
+_IMG_INCLUDE = re.compile(r'2204|2404')
+_IMG_EXCLUDE = re.compile(r'accelerator|pro|minimal')
+UBUNTU_IMAGES_FILTER = (
+    f"name~ubuntu AND architecture=X86_64 AND name~\"{_IMG_INCLUDE.pattern}\" "
+    f"AND NOT name~\"{_IMG_EXCLUDE.pattern}\""
+)
+
+# Friendly names for Ubuntu LTS images, keyed on (version, variant)
+_IMAGE_VERSION_RE = re.compile(r'ubuntu-(?:(minimal)-)?(2204|2404)')
+IMAGE_DESCRIPTIONS = {
+    ('2204', None): "Ubuntu 22.04 LTS Standard",
+    ('2204', 'minimal'): "Ubuntu 22.04 LTS Minimal",
+    ('2404', None): "Ubuntu 24.04 LTS Standard",
+    ('2404', 'minimal'): "Ubuntu 24.04 LTS Minimal",
+}
+
+# gcloud storage tuning applied by 'set' (parallel composite uploads, no compat-check RPC)
+GCLOUD_STORAGE_CONFIG = {
+    "storage/parallel_composite_upload_enabled": "True",
+    "storage/parallel_composite_upload_compatibility_check": "False",
+    "storage/parallel_composite_upload_threshold": "50M",
+}
+
+# On-disk cache of the image list, shared across invocations
+IMAGES_CACHE_PATH = Path.home() / '.cache' / 'gcp-free' / 'images.json'
+IMAGES_CACHE_TTL = 3600  # 1 hour
+
+def check_dependencies(check_auth=True):
     """Check for required dependencies and offer to install if missing."""
     missing_deps = []
-    
-    # Check for gcloud CLI
+
+    # Launch the gcloud and auth checks concurrently (each gcloud call is slow to start)
+    version_proc = auth_proc = None
     try:
-        result = subprocess.run(['gcloud', '--version'], capture_output=True, text=True)
-        if result.returncode != 0:
-            missing_deps.append('gcloud')
+        version_proc = subprocess.Popen(['gcloud', '--version'],
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if check_auth:
+            auth_proc = subprocess.Popen(['gcloud', 'auth', 'list', '--filter=status:ACTIVE',
+                                          '--format=value(account)'],
+                                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
     except FileNotFoundError:
+        pass  # gcloud not installed
+
+    # Check for gcloud CLI
+    if version_proc is None:
         missing_deps.append('gcloud')
-    
+    else:
+        if version_proc.wait() != 0:
+            missing_deps.append('gcloud')
+
     # Check if gcloud is authenticated
-    try:
-        result = subprocess.run(['gcloud', 'auth', 'list', '--filter=status:ACTIVE'], 
-                              capture_output=True, text=True)
-        if 'ACTIVE' not in result.stdout:
+    if check_auth:
+        auth_out = auth_proc.communicate()[0] if auth_proc else ""
+        if not auth_out.strip():
             missing_deps.append('gcloud-auth')
-    except:
-        missing_deps.append('gcloud-auth')
-    
+
     if missing_deps:
         print("⚠️  Missing dependencies detected:")
         print()
@@ -141,8 +227,12 @@ class Spinner:
         self._stop = threading.Event()
         self._thread = None
         self._cursor_hidden = False
-        self._render_lock = threading.Lock()
-        self._last_len = 0
+        # Pre-render every frame once, padded to a common width, so each tick is a single write
+        rendered = [f"{frame} {text}" for frame in self._frames]
+        self._width = max(len(line) for line in rendered)
+        self._rendered = [line.ljust(self._width) for line in rendered]
+        # Animation only makes sense on a terminal; piped/redirected output gets a single line
+        self._tty = bool(getattr(stream, 'isatty', lambda: False)())
 
     def _get_frames(self, name):
         if isinstance(name, (list, tuple)) and name:
@@ -150,43 +240,44 @@ class Spinner:
         return _SPINNERS.get(str(name), _SPINNERS["dots"])
 
     def _hide_cursor(self):
-        if not self._cursor_hidden:
+        if self._tty and not self._cursor_hidden:
             self.stream.write("\x1b[?25l")
             self.stream.flush()
             self._cursor_hidden = True
 
     def _show_cursor(self):
-        if self._cursor_hidden:
+        if self._tty and self._cursor_hidden:
             self.stream.write("\x1b[?25h")
             self.stream.flush()
             self._cursor_hidden = False
 
     def _render(self, s: str):
-        pad = max(0, self._last_len - len(s))
-        self.stream.write("\r" + s + (" " * pad))
+        if not self._tty:
+            return
+        self.stream.write("\r" + s)
         self.stream.flush()
-        self._last_len = len(s)
 
     def _loop(self):
+        if not self._tty:
+            self.stream.write(f"{self.text}\n")
+            self.stream.flush()
+            self._stop.wait()
+            return
         i = 0
         self._hide_cursor()
         while not self._stop.is_set():
-            frame = self._frames[i % len(self._frames)]
-            line = f"{frame} {self.text}"
-            with self._render_lock:
-                self._render(line)
+            self._render(self._rendered[i % len(self._rendered)])
             i += 1
-            end = time.time() + self.interval
-            while time.time() < end:
-                if self._stop.is_set():
-                    break
-                time.sleep(0.01)
+            # Sleep one interval, waking immediately if stopped
+            if self._stop.wait(self.interval):
+                break
 
     def _clear_line(self):
-        self._render("")
+        if not self._tty:
+            return
+        self._render(" " * self._width)
         self.stream.write("\r")
         self.stream.flush()
-        self._last_len = 0
 
     def start(self):
         if self._thread and self._thread.is_alive():
@@ -196,22 +287,56 @@ class Spinner:
         self._thread.start()
         return self
 
+    def run(self, cmd, timeout=None):
+        """Run cmd while animating from the calling thread (no spinner thread).
+
+        Behaves like subprocess.run(cmd, capture_output=True, text=True, check=True,
+        timeout=timeout): raises CalledProcessError or TimeoutExpired on failure.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if self._tty:
+            self._hide_cursor()
+        else:
+            self.stream.write(f"{self.text}\n")
+            self.stream.flush()
+        i = 0
+        while True:
+            self._render(self._rendered[i % len(self._rendered)])
+            i += 1
+            # Waiting in communicate() keeps draining the pipes between frames
+            try:
+                stdout, stderr = proc.communicate(timeout=self.interval)
+                break
+            except subprocess.TimeoutExpired:
+                if deadline and time.monotonic() >= deadline:
+                    proc.kill()
+                    proc.communicate()
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
     def stop(self):
         self._stop.set()
         if self._thread:
             self._thread.join()
-        with self._render_lock:
-            self._clear_line()
+        # The spinner thread has exited, so this is the only writer left
+        self._clear_line()
         self._show_cursor()
 
+    def _mark(self, symbol, color):
+        # Colour only on a terminal; piped/CI output gets the plain symbol
+        return f"{color}{symbol}{_RESET}" if self._tty else symbol
+
     def succeed(self, text="Done."):
         self.stop()
-        self.stream.write(f"{_GREEN}✔{_RESET} {text}\n")
+        self.stream.write(f"{self._mark('✔', _GREEN)} {text}\n")
         self.stream.flush()
 
     def fail(self, text="Failed."):
         self.stop()
-        self.stream.write(f"{_RED}✖{_RESET} {text}\n")
+        self.stream.write(f"{self._mark('✖', _RED)} {text}\n")
         self.stream.flush()
 
     def __enter__(self):
@@ -235,28 +360,278 @@ atexit.register(_restore_all)
 def run_cmd(cmd):
     return subprocess.check_output(cmd, text=True).strip()
 
+# Compute Engine REST API (used when google-auth and Application Default Credentials are available)
+_COMPUTE_API = "https://compute.googleapis.com/compute/v1"
+_API_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+_API_TIMEOUT = 30  # seconds per HTTP request
+_API_AUTH_TIMEOUT = 5  # seconds for the up-front token fetch
+
+# Same selection as UBUNTU_IMAGES_FILTER, split into server- and client-side parts
+_API_IMAGES_FILTER = f'name eq "ubuntu-.*({_IMG_INCLUDE.pattern}).*"'
+
+@functools.lru_cache(maxsize=1)
+def _compute_session():
+    """Return an authorized session for the Compute API, or None to fall back to gcloud."""
+    if google is None:
+        return None
+    # Only use ADC when it is explicitly configured; otherwise google.auth.default()
+    # probes the GCE metadata server, which costs seconds before falling back anyway
+    if not (os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+            or os.path.exists(_cloud_sdk.get_application_default_credentials_path())):
+        return None
+    try:
+        credentials, _ = google.auth.default(scopes=_API_SCOPES)
+        # Fetch the token now so stale credentials fall back to gcloud up front;
+        # a short timeout keeps a stalled network from blocking the fallback
+        credentials.refresh(functools.partial(Request(), timeout=_API_AUTH_TIMEOUT))
+    except google.auth.exceptions.GoogleAuthError:
+        return None
+    # One session for the whole run: keeps the TLS connection alive between calls, sends
+    # the cached token on every request and refreshes it once on a 401 before retrying
+    session = AuthorizedSession(credentials, max_refresh_attempts=1)
+    session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+    return session
+
+def _api_error(cmd, response):
+    # Surface API errors like a failed gcloud call so callers share one error path
+    try:
+        message = response.json()['error']['message']
+    except (ValueError, KeyError, TypeError):
+        message = response.text
+    return subprocess.CalledProcessError(1, cmd, output="", stderr=f"ERROR: {message}")
+
+def _api_request(session, method, url, cmd, check=True, **kwargs):
+    """Send one Compute API request, raising network/auth/HTTP failures as CalledProcessError."""
+    kwargs.setdefault('timeout', _API_TIMEOUT)
+    try:
+        response = session.request(method, url, **kwargs)
+    except (requests.exceptions.RequestException, google.auth.exceptions.GoogleAuthError) as e:
+        raise subprocess.CalledProcessError(1, cmd, output="", stderr=f"ERROR: {e}")
+    if check and not response.ok:
+        raise _api_error(cmd, response)
+    return response
+
+def _api_get_all(session, url, cmd, params=None, empty=()):
+    """Yield the items of every page of a Compute API list call (empty if a page has none)."""
+    params = dict(params or {})
+    while True:
+        page = _api_request(session, "GET", url, cmd, params=params).json()
+        yield page.get('items') or empty
+        if 'nextPageToken' not in page:
+            return
+        params['pageToken'] = page['nextPageToken']
+
+def _api_wait(session, operation, cmd, timeout=None):
+    """Block until a zonal operation finishes, raising on error or timeout."""
+    project = get_defaults().project
+    deadline = time.time() + timeout if timeout else None
+    url = f"{_COMPUTE_API}/projects/{project}/zones/{DEFAULT_ZONE}/operations/{operation['name']}/wait"
+    while operation.get('status') != 'DONE':
+        # The server holds each /wait call for up to ~2 minutes; never wait past the deadline
+        request_timeout = _API_TIMEOUT + 120
+        if deadline:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            request_timeout = min(request_timeout, remaining)
+        try:
+            response = session.post(url, timeout=request_timeout)
+        except requests.exceptions.Timeout:
+            if deadline and time.time() >= deadline - 1:
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            raise subprocess.CalledProcessError(1, cmd, output="", stderr="ERROR: Compute API request timed out")
+        except (requests.exceptions.RequestException, google.auth.exceptions.GoogleAuthError) as e:
+            raise subprocess.CalledProcessError(1, cmd, output="", stderr=f"ERROR: {e}")
+        if not response.ok:
+            raise _api_error(cmd, response)
+        operation = response.json()
+    if 'error' in operation:
+        messages = [err.get('message', '') for err in operation['error'].get('errors', [])]
+        raise subprocess.CalledProcessError(1, cmd, output="", stderr="ERROR: " + "\n".join(messages))
+    return operation
+
+def _api_list_images(session, cmd):
+    images = []
+    url = f"{_COMPUTE_API}/projects/ubuntu-os-cloud/global/images"
+    for items in _api_get_all(session, url, cmd, {'filter': _API_IMAGES_FILTER}):
+        for img in items:
+            # gcloud hides deprecated images and we only want AMD64 Standard
+            if ('deprecated' in img or img.get('architecture') != 'X86_64'
+                    or not _IMG_INCLUDE.search(img['name']) or _IMG_EXCLUDE.search(img['name'])):
+                continue
+            images.append(img['name'])
+    return images
+
+def _api_list_instances(session, cmd):
+    project = get_defaults().project
+    instances = []
+    url = f"{_COMPUTE_API}/projects/{project}/aggregated/instances"
+    for items in _api_get_all(session, url, cmd, empty={}):
+        for scope in items.values():
+            instances.extend(scope.get('instances', []))
+    return instances
+
+def _instances_table(instances):
+    """Format instances like gcloud's default table (empty string if none)."""
+    if not instances:
+        return ""
+    rows = [["NAME", "ZONE", "MACHINE_TYPE", "PREEMPTIBLE", "INTERNAL_IP", "EXTERNAL_IP", "STATUS"]]
+    for inst in instances:
+        nic = (inst.get('networkInterfaces') or [{}])[0]
+        access = (nic.get('accessConfigs') or [{}])[0]
+        rows.append([
+            inst['name'],
+            inst['zone'].rsplit('/', 1)[-1],
+            inst['machineType'].rsplit('/', 1)[-1],
+            "true" if inst.get('scheduling', {}).get('preemptible') else "",
+            nic.get('networkIP', ""),
+            access.get('natIP', ""),
+            inst.get('status', ""),
+        ])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(col.ljust(w) for col, w in zip(row, widths)).rstrip() for row in rows)
+
+def _api_create_instance(session, cmd, vm_name, machine_type, image, timeout=None):
+    project = get_defaults().project
+    zone = f"projects/{project}/zones/{DEFAULT_ZONE}"
+    # Mirrors the gcloud create flags (and gcloud's default network/service account)
+    body = {
+        "name": vm_name,
+        "machineType": f"{zone}/machineTypes/{machine_type}",
+        "disks": [{
+            "boot": True,
+            "autoDelete": True,
+            "initializeParams": {
+                "sourceImage": f"projects/ubuntu-os-cloud/global/images/{image}",
+                "diskSizeGb": "30",
+                "diskType": f"{zone}/diskTypes/pd-standard",
+            },
+        }],
+        "networkInterfaces": [{
+            "network": "global/networks/default",
+            "accessConfigs": [{"name": "External NAT", "type": "ONE_TO_ONE_NAT"}],
+        }],
+        "serviceAccounts": [{
+            "email": "default",
+            "scopes": [
+                "https://www.googleapis.com/auth/devstorage.read_only",
+                "https://www.googleapis.com/auth/logging.write",
+                "https://www.googleapis.com/auth/monitoring.write",
+                "https://www.googleapis.com/auth/servicecontrol",
+                "https://www.googleapis.com/auth/service.management.readonly",
+                "https://www.googleapis.com/auth/trace.append",
+            ],
+        }],
+    }
+    response = _api_request(session, "POST", f"{_COMPUTE_API}/{zone}/instances", cmd, json=body)
+    _api_wait(session, response.json(), cmd, timeout=timeout)
+    return _api_request(session, "GET", f"{_COMPUTE_API}/{zone}/instances/{vm_name}", cmd).json()
+
+def _api_instance_exists(session, cmd, vm_name):
+    """Return True if vm_name exists (a single cheap GET; no gcloud process)."""
+    project = get_defaults().project
+    url = f"{_COMPUTE_API}/projects/{project}/zones/{DEFAULT_ZONE}/instances/{vm_name}"
+    return _api_request(session, "GET", url, cmd, check=False).ok
+
+def _api_delete_instance(session, cmd, vm_name, timeout):
+    project = get_defaults().project
+    url = f"{_COMPUTE_API}/projects/{project}/zones/{DEFAULT_ZONE}/instances/{vm_name}"
+    response = _api_request(session, "DELETE", url, cmd)
+    _api_wait(session, response.json(), cmd, timeout=timeout)
+
+@functools.lru_cache(maxsize=4)
+def _fetch_ubuntu_images(image_filter=UBUNTU_IMAGES_FILTER):
+    """Return image names matching image_filter, cached in memory and on disk."""
+    # Reuse the on-disk list if it is fresh and was built with the same filter
+    try:
+        if time.time() - IMAGES_CACHE_PATH.stat().st_mtime < IMAGES_CACHE_TTL:
+            cached = json.loads(IMAGES_CACHE_PATH.read_text())
+            if cached.get('filter') == image_filter:
+                return tuple(cached['images'])
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    cmd = [
+        "gcloud", "compute", "images", "list",
+        f"--filter={image_filter}",
+        "--format=value(name)"
+    ]
+
+    session = _compute_session()
+    if session and image_filter == UBUNTU_IMAGES_FILTER:
+        names = _api_list_images(session, cmd)
+    else:
+        names = subprocess.check_output(cmd, text=True).split()
+    # Sort so the gcloud and API paths produce (and cache) the same list
+    images = tuple(sorted(names))
+
+    # Never cache an empty listing; it is more likely a transient failure than no images
+    if not images:
+        return images
+
+    # Write the cache atomically; failing to cache is not an error
+    try:
+        IMAGES_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = IMAGES_CACHE_PATH.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps({'filter': image_filter, 'images': list(images)}))
+        os.replace(tmp_path, IMAGES_CACHE_PATH)
+    except OSError:
+        pass
+
+    return images
+
+def _ubuntu_images_or_report():
+    """Return the Ubuntu image list, or print why it is unavailable and return None."""
+    try:
+        images = _fetch_ubuntu_images()
+    except subprocess.CalledProcessError as e:
+        print("✖ Failed to list Ubuntu images")
+        if e.stderr:
+            print(e.stderr.rstrip())
+        print()
+        return None
+    if not images:
+        print("✖ No Ubuntu images found")
+        print()
+        return None
+    return images
+
+def image_description(image, default=None):
+    """Return a user-friendly name for image, or default (the image name itself if None)."""
+    m = _IMAGE_VERSION_RE.search(image)
+    desc = IMAGE_DESCRIPTIONS.get((m.group(2), m.group(1))) if m else None
+    return desc or (image if default is None else default)
+
 def list_ubuntu_images():
-    cmd = "gcloud compute images list --filter=\"name~ubuntu AND architecture=X86_64\" --format=\"value(name)\" | egrep '2204|2404' | egrep -v 'accelerator|pro|minimal'"
-    # print(f"Running: {cmd}")
-    # print()
-    
-    # Run the actual command
-    standard_output = subprocess.check_output(cmd, shell=True, text=True).strip()
-    standard_images = standard_output.splitlines() if standard_output else []
+    default_image = get_defaults().image
+    standard_images = _ubuntu_images_or_report()
+    if standard_images is None:
+        return
     
     for idx, img in enumerate(standard_images, 1):
-        marker = " (default)" if img == DEFAULT_IMAGE else ""
+        marker = " (default)" if img == default_image else ""
         print(f"{idx}. {img}{marker}")
     print()  # Add extra blank line
 
 def list_vms():
+    project = get_defaults().project
     cmd = [
         "gcloud", "compute", "instances", "list",
-        f"--project={DEFAULT_PROJECT}"
+        f"--project={project}"
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.stdout.strip():
-        print(result.stdout.rstrip())  # Remove trailing whitespace/newlines
+    session = _compute_session()
+    if session:
+        try:
+            output = _instances_table(_api_list_instances(session, cmd))
+        except subprocess.CalledProcessError as e:
+            # Don't follow an API error with "Listed 0 items." (the VM may well exist)
+            print(e.stderr)
+            print()
+            return
+    else:
+        output = subprocess.run(cmd, capture_output=True, text=True).stdout
+    if output.strip():
+        print(output.rstrip())  # Remove trailing whitespace/newlines
         print()  # Add blank line after output
     else:
         print("Listed 0 items.")
@@ -264,42 +639,33 @@ def list_vms():
 
 
 def create_vm(vm_name="free-tier", machine_type="e2-micro"):
-    # Check if VM already exists
-    check_cmd = [
-        "gcloud", "compute", "instances", "describe", vm_name,
-        f"--project={DEFAULT_PROJECT}",
-        f"--zone={DEFAULT_ZONE}",
-        "--format=value(name)"
-    ]
-    
-    try:
-        subprocess.run(check_cmd, capture_output=True, text=True, check=True)
-        print(f"✖ VM '{vm_name}' already exists.")
-        print()
+    project, default_image = get_defaults()
+
+    # On the REST path an existence check is one cheap GET, so report an existing VM
+    # before asking for an image. On the gcloud path it would cost a second gcloud
+    # startup, so there the user picks an image first and create reports "already exists".
+    session = _compute_session()
+    if session:
+        try:
+            exists = _api_instance_exists(session, ["gcloud", "compute", "instances", "describe", vm_name], vm_name)
+        except subprocess.CalledProcessError:
+            exists = False  # Unknown; the create call will report it
+        if exists:
+            print(f"✖ VM '{vm_name}' already exists.")
+            print()
+            return
+
+    # Get available images (shared with image listing, cached)
+    available_images = _ubuntu_images_or_report()
+    if available_images is None:
         return
-    except subprocess.CalledProcessError:
-        # VM doesn't exist, proceed with creation
-        pass
-    
-    # Get available images using same command as image listing
-    cmd = "gcloud compute images list --filter=\"name~ubuntu AND architecture=X86_64\" --format=\"value(name)\" | egrep '2204|2404' | egrep -v 'accelerator|pro|minimal'"
-    standard_output = subprocess.check_output(cmd, shell=True, text=True).strip()
-    available_images = standard_output.splitlines() if standard_output else []
     
     # Create image options with descriptions
-    images = []
-    for img in available_images:
-        if "2204" in img:
-            desc = "Ubuntu 22.04 LTS Standard"
-        elif "2404" in img:
-            desc = "Ubuntu 24.04 LTS Standard"
-        else:
-            desc = "Ubuntu LTS Standard"
-        images.append((img, desc))
+    images = [(img, image_description(img, "Ubuntu LTS Standard")) for img in available_images]
     
     print("Available Ubuntu Images:")
     for i, (img, desc) in enumerate(images, 1):
-        marker = " (default)" if img == DEFAULT_IMAGE else ""
+        marker = " (default)" if img == default_image else ""
         print(f"  {i}. {img}{marker}")
     
     while True:
@@ -315,20 +681,11 @@ def create_vm(vm_name="free-tier", machine_type="e2-micro"):
             print(f"Please enter a number between 1 and {len(images)}")
     
     # Get user-friendly image name for display
-    if "2204" in image and "minimal" in image:
-        image_desc = "Ubuntu 22.04 LTS Minimal"
-    elif "2404" in image and "minimal" in image:
-        image_desc = "Ubuntu 24.04 LTS Minimal"
-    elif "2204" in image:
-        image_desc = "Ubuntu 22.04 LTS Standard"
-    elif "2404" in image:
-        image_desc = "Ubuntu 24.04 LTS Standard"
-    else:
-        image_desc = image
+    image_desc = image_description(image)
     
     cmd = [
         "gcloud", "compute", "instances", "create", vm_name,
-        f"--project={DEFAULT_PROJECT}",
+        f"--project={project}",
         f"--zone={DEFAULT_ZONE}",
         f"--machine-type={machine_type}",
         f"--image={image}",
@@ -340,14 +697,20 @@ def create_vm(vm_name="free-tier", machine_type="e2-micro"):
     # print(f"Running: {' '.join(cmd)}")
     print("(this can take up to 3 mins)")
     
-    spinner = Spinner(f"Creating VM '{vm_name}' with {image_desc}...", "dots").start()
+    spinner = Spinner(f"Creating VM '{vm_name}' with {image_desc}...", "dots")
     _instances.append(spinner)
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        # Set timeout to 3 minutes (180 seconds)
+        if session:
+            spinner.start()
+            instance = _api_create_instance(session, cmd, vm_name, machine_type, image, timeout=180)
+            output = _instances_table([instance])
+        else:
+            output = spinner.run(cmd, timeout=180).stdout
         spinner.succeed(f"VM '{vm_name}' created successfully!")
-        if result.stdout:
-            print(result.stdout)
+        if output:
+            print(output)
         
         # Show 1-minute preparation progress
         prep_spinner = Spinner("Preparing your VM...", "dots").start()
@@ -355,7 +718,19 @@ def create_vm(vm_name="free-tier", machine_type="e2-micro"):
         time.sleep(60)  # Wait 1 minute
         prep_spinner.succeed("VM is ready!")
         print()  # Add extra blank line
+    except subprocess.TimeoutExpired:
+        spinner.fail(f"Create operation timed out after 3 minutes")
+        print(f"The creation may still be in progress. You can:")
+        print(f"1. Check status: python {sys.argv[0]} list")
+        print(f"2. Check via console:")
+        print(f"   https://console.cloud.google.com/compute/instances?project={project}")
+        print()  # Add extra blank line
     except subprocess.CalledProcessError as e:
+        # No separate existence check; gcloud reports it on create
+        if e.stderr and "already exists" in e.stderr:
+            spinner.fail(f"VM '{vm_name}' already exists.")
+            print()
+            return
         spinner.fail(f"Failed to create VM '{vm_name}'")
         print(f"Command: {' '.join(cmd)}")
         if e.stderr:
@@ -364,60 +739,32 @@ def create_vm(vm_name="free-tier", machine_type="e2-micro"):
 
 
 def ssh_vm(vm_name):
-    # Check if VM exists first
-    check_cmd = [
-        "gcloud", "compute", "instances", "describe", vm_name,
-        f"--project={DEFAULT_PROJECT}",
-        f"--zone={DEFAULT_ZONE}",
-        "--format=value(name)"
-    ]
-    
-    try:
-        subprocess.run(check_cmd, capture_output=True, text=True, check=True)
-    except subprocess.CalledProcessError:
-        print(f"✖ VM '{vm_name}' not found.")
-        print()
-        return
-    
+    project = get_defaults().project
     cmd = [
         "gcloud", "compute", "ssh", vm_name,
-        f"--project={DEFAULT_PROJECT}",
+        f"--project={project}",
         f"--zone={DEFAULT_ZONE}"
     ]
     
     # print(f"Running: {' '.join(cmd)}")
     # print()
     
-    # Use subprocess.run without capture_output to allow interactive SSH
+    # Use subprocess.run without capture_output to allow interactive SSH;
+    # stderr is not captured, so gcloud's own error (e.g. "was not found") is shown as-is
     try:
         subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
+    except subprocess.CalledProcessError:
         print(f"✖ Failed to SSH to VM '{vm_name}'")
+        print(f"If gcloud reported the VM was not found, create it first: python {sys.argv[0]} create")
         print(f"Command: {' '.join(cmd)}")
-        if e.stderr:
-            print(e.stderr)
         print()
 
 
 def delete_vm(vm_name):
-    # Check if VM exists first
-    check_cmd = [
-        "gcloud", "compute", "instances", "describe", vm_name,
-        f"--project={DEFAULT_PROJECT}",
-        f"--zone={DEFAULT_ZONE}",
-        "--format=value(name)"
-    ]
-    
-    try:
-        subprocess.run(check_cmd, capture_output=True, text=True, check=True)
-    except subprocess.CalledProcessError:
-        print(f"✖ VM '{vm_name}' not found.")
-        print()
-        return
-    
+    project = get_defaults().project
     cmd = [
         "gcloud", "compute", "instances", "delete", vm_name,
-        f"--project={DEFAULT_PROJECT}",
+        f"--project={project}",
         f"--zone={DEFAULT_ZONE}",
         "--quiet"
     ]
@@ -425,61 +772,81 @@ def delete_vm(vm_name):
     # print(f"Running: {' '.join(cmd)}")
     print("(this can take up to 3 mins)")
     
-    spinner = Spinner(f"Deleting VM '{vm_name}'...", "dots").start()
+    session = _compute_session()
+    spinner = Spinner(f"Deleting VM '{vm_name}'...", "dots")
     _instances.append(spinner)
     
     try:
-        # Set timeout to 3 minutes (180 seconds)
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=180)
+        if session:
+            spinner.start()
+            # Set timeout to 3 minutes (180 seconds)
+            _api_delete_instance(session, cmd, vm_name, timeout=180)
+            output = ""
+        else:
+            # Set timeout to 3 minutes (180 seconds)
+            output = spinner.run(cmd, timeout=180).stdout
         spinner.succeed(f"VM '{vm_name}' deleted successfully!")
-        if result.stdout:
-            print(result.stdout)
+        if output:
+            print(output)
         print()  # Add extra blank line
     except subprocess.TimeoutExpired:
         spinner.fail(f"Delete operation timed out after 3 minutes")
         print(f"The deletion may still be in progress. You can:")
         print(f"1. Check status: python {sys.argv[0]} list")
         print(f"2. Delete manually via console:")
-        print(f"   https://console.cloud.google.com/compute/instances?project={DEFAULT_PROJECT}")
-        print(f"3. Or run: gcloud compute instances delete {vm_name} --project={DEFAULT_PROJECT} --zone={DEFAULT_ZONE}")
+        print(f"   https://console.cloud.google.com/compute/instances?project={project}")
+        print(f"3. Or run: gcloud compute instances delete {vm_name} --project={project} --zone={DEFAULT_ZONE}")
         print()  # Add extra blank line
     except subprocess.CalledProcessError as e:
+        # No separate existence check; gcloud reports it on delete
+        if e.stderr and "was not found" in e.stderr:
+            spinner.fail(f"VM '{vm_name}' not found.")
+            print()
+            return
         spinner.fail(f"Failed to delete VM '{vm_name}'")
         print(f"Command: {' '.join(cmd)}")
         if e.stderr:
             print(e.stderr)
         print()  # Add extra blank line
 
+def configure_gcloud_storage():
+    """Apply GCLOUD_STORAGE_CONFIG, skipping properties that are already set."""
+    # Query all properties concurrently; each gcloud call is slow to start
+    procs = {
+        prop: subprocess.Popen(["gcloud", "config", "get-value", prop],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for prop in GCLOUD_STORAGE_CONFIG
+    }
+    changed = []
+    for prop, proc in procs.items():
+        current = proc.communicate()[0].strip()
+        value = GCLOUD_STORAGE_CONFIG[prop]
+        if current.lower() == value.lower():
+            continue
+        result = subprocess.run(["gcloud", "config", "set", prop, value],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode == 0:
+            changed.append(f"{prop}={value}")
+    return changed
+
 def configure_settings():
-    env_path = Path.home() / '.env'
-    
     print("Configure Default Settings")
     print("=" * 30)
     
     # Current values
-    current_project = os.getenv('GCP_PROJECT', 'your-default-project')
-    current_image = os.getenv('GCP_IMAGE', 'ubuntu-2204-jammy-v20250815')
+    current_project, current_image = get_defaults()
     
     print(f"\nCurrent GCP_PROJECT: {current_project}")
     
     # Get new project
     new_project = input("Enter GCP Project ID (or press Enter to keep current): ").strip()
     
-    # Get available images using same command as image listing
-    cmd = "gcloud compute images list --filter=\"name~ubuntu AND architecture=X86_64\" --format=\"value(name)\" | egrep '2204|2404' | egrep -v 'accelerator|pro|minimal'"
-    standard_output = subprocess.check_output(cmd, shell=True, text=True).strip()
-    available_images = standard_output.splitlines() if standard_output else []
+    # Get available images (shared with image listing, cached)
+    # (on failure the project can still be updated; the image is kept)
+    available_images = _ubuntu_images_or_report() or ()
     
     # Create image options with descriptions
-    images = []
-    for img in available_images:
-        if "2204" in img:
-            desc = "Ubuntu 22.04 LTS Standard"
-        elif "2404" in img:
-            desc = "Ubuntu 24.04 LTS Standard"
-        else:
-            desc = "Ubuntu LTS Standard"
-        images.append((img, desc))
+    images = [(img, image_description(img, "Ubuntu LTS Standard")) for img in available_images]
     
     print(f"\nCurrent Image: {current_image}")
     print("Available Ubuntu Images:")
@@ -489,66 +856,56 @@ def configure_settings():
     
     new_image_choice = input(f"Choose image (1-{len(images)}, or press Enter to keep current): ").strip()
     
+    new_image = None
+    if new_image_choice.isdigit() and 1 <= int(new_image_choice) <= len(images):
+        new_image = images[int(new_image_choice) - 1][0]
+    
     # Update settings
-    changes_made = False
+    updates = {}
+    if new_project:
+        updates['GCP_PROJECT'] = new_project
+    if new_image:
+        updates['GCP_IMAGE'] = new_image
+    
+    # Read existing file once. Every line is kept verbatim except assignments to the
+    # keys being updated: the first one is replaced, later duplicates are dropped
     lines = []
-    project_found = False
-    image_found = False
-    
-    # Read existing file
-    if env_path.exists():
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith('GCP_PROJECT='):
-                    if new_project:
-                        lines.append(f'GCP_PROJECT={new_project}')
-                        changes_made = True
-                    else:
-                        lines.append(line)
-                    project_found = True
-                elif line.startswith('GCP_IMAGE='):
-                    if new_image_choice and new_image_choice.isdigit():
-                        idx = int(new_image_choice) - 1
-                        if 0 <= idx < len(images):
-                            lines.append(f'GCP_IMAGE={images[idx][0]}')
-                            changes_made = True
-                        else:
-                            lines.append(line)
-                    else:
-                        lines.append(line)
-                    image_found = True
-                else:
-                    lines.append(line)
+    replaced = set()
+    if ENV_PATH.exists():
+        for line in ENV_PATH.read_text().splitlines():
+            stripped = line.strip()
+            key = None
+            if stripped and not stripped.startswith('#') and '=' in stripped:
+                key = stripped.split('=', 1)[0].strip()
+            if key in updates:
+                if key not in replaced:
+                    lines.append(f'{key}={updates[key]}')
+                    replaced.add(key)
+                continue
+            lines.append(line)
     
     # Add missing entries
-    if new_project and not project_found:
-        lines.append(f'GCP_PROJECT={new_project}')
-        changes_made = True
-    
-    if new_image_choice and new_image_choice.isdigit() and not image_found:
-        idx = int(new_image_choice) - 1
-        if 0 <= idx < len(images):
-            lines.append(f'GCP_IMAGE={images[idx][0]}')
-            changes_made = True
+    lines.extend(f'{key}={value}' for key, value in updates.items() if key not in replaced)
     
     # Write back to file if changes were made
-    if changes_made:
-        with open(env_path, 'w') as f:
-            for line in lines:
-                if line:  # Skip empty lines
-                    f.write(line + '\n')
+    if updates:
+        _write_env_file('\n'.join(lines) + '\n')
         
         print(f"\n✓ Settings updated!")
         if new_project:
             print(f"   Project: {new_project}")
-        if new_image_choice and new_image_choice.isdigit():
-            idx = int(new_image_choice) - 1
-            if 0 <= idx < len(images):
-                print(f"   Image: {images[idx][0]}")
+        if new_image:
+            print(f"   Image: {new_image}")
         print("Please restart the script for changes to take effect.")
     else:
         print("\n✓ No changes made.")
+    
+    # Tune gcloud once; already-applied properties are left alone
+    tuned = configure_gcloud_storage()
+    if tuned:
+        print(f"\n✓ gcloud storage settings updated:")
+        for setting in tuned:
+            print(f"   {setting}")
         
     print(f"\nOther defaults (Free Tier eligible):")
     print(f"  VM Name: free-tier")
@@ -559,7 +916,8 @@ def configure_settings():
 
 
 def usage():
-    if DEFAULT_PROJECT == 'your-default-project':
+    project, default_image = get_defaults()
+    if project == 'your-default-project':
         print("ERROR: GCP_PROJECT not found in ~/.env file")
         print("Please create ~/.env with: GCP_PROJECT=your-project-id\n")
         return
@@ -568,7 +926,7 @@ def usage():
     print(f"  VM Name: free-tier")
     print(f"  Zone: {DEFAULT_ZONE}")
     print(f"  Machine: e2-micro (0.25 vCPU, 1GB RAM)")
-    print(f"  Image: {DEFAULT_IMAGE}")
+    print(f"  Image: {default_image}")
     print(f"  Boot Disk: 30GB pd-standard\n")
     print("Usage:")
     print("  python gcp-free.py list")
@@ -584,31 +942,50 @@ def usage():
     print("  python gcp-free.py delete")
     print("      Delete the 'free-tier' VM (takes 2-3 minutes).\n")
 
+# Commands that need gcloud, and whether they need an authenticated account up front
+# ('image' fails fast with a clear gcloud error if it is not authenticated)
+_GCLOUD_COMMANDS = {
+    "list": True,
+    "image": False,
+    "set": True,
+    "create": True,
+    "ssh": True,
+    "delete": True,
+}
+
+# Commands served entirely by the Compute API fast path ('ssh' and 'set' always need gcloud)
+_API_COMMANDS = {"list", "image", "create", "delete"}
+
 def main():
-    # Check dependencies first
-    if not check_dependencies():
-        return
-        
     if len(sys.argv) < 2:
         usage()
         return
 
     cmd = sys.argv[1]
 
+    # Reject misuse before starting any subprocess ('list' and 'image' ignore extra arguments)
+    if cmd not in _GCLOUD_COMMANDS or (len(sys.argv) != 2 and cmd not in ("list", "image")):
+        usage()
+        return
+
+    # Check gcloud dependencies, except for REST-served commands when the Compute API
+    # session is available
+    if not (cmd in _API_COMMANDS and _compute_session()):
+        if not check_dependencies(check_auth=_GCLOUD_COMMANDS[cmd]):
+            return
+
     if cmd == "list":
         list_vms()
     elif cmd == "image":
         list_ubuntu_images()
-    elif cmd == "create" and len(sys.argv) == 2:
+    elif cmd == "create":
         create_vm()
-    elif cmd == "ssh" and len(sys.argv) == 2:
+    elif cmd == "ssh":
         ssh_vm("free-tier")
-    elif cmd == "delete" and len(sys.argv) == 2:
+    elif cmd == "delete":
         delete_vm("free-tier")
-    elif cmd == "set" and len(sys.argv) == 2:
+    elif cmd == "set":
         configure_settings()
-    else:
-        usage()
 
 if __name__ == "__main__":
     main()